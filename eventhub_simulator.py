@@ -34,57 +34,128 @@ import time
 import random
 import string
 import asyncio
-import argparse
 import signal
-from datetime import datetime, timezone
+import functools
 from typing import List, Dict, Any, Optional
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import logging
 
 try:
     from azure.eventhub.aio import EventHubProducerClient
-    from azure.eventhub import EventData
+    from azure.eventhub import EventData, TransportType
 except ImportError:
     print("Error: Azure Event Hub SDK not found. Install with: pip install azure-eventhub")
     sys.exit(1)
 
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    _json_loads = orjson.loads
+    _JSONDecodeError = orjson.JSONDecodeError
+except ImportError:
+    # Fallback to stdlib json (noticeably slower in the generation hot path)
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode()
+
+    _json_loads = json.loads
+    _JSONDecodeError = json.JSONDecodeError
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Batch generation falls back to the per-message path
+
+try:
+    # Compiled field renderer; build with `cythonize -i message_gen.pyx`
+    import message_gen as _message_gen
+except ImportError:
+    _message_gen = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None  # Only needed for --format msgpack
+
+
+# Environment overrides resolved once at import; they cannot change mid-run
+_ENV_CONNECTION_STRING = os.getenv('EVENT_HUB_CONNECTION_STRING')
+_ENV_EVENTHUB_NAME = os.getenv('EVENT_HUB_NAME')
+
+# Immutable so the shared default can never be mutated by a caller
+DEFAULT_SYMBOLS = ('AAPL', 'GOOGL', 'MSFT', 'TSLA', 'AMZN')
+
+# Shared sentinel for config lookups, instead of allocating a fresh {} per miss
+_EMPTY: Dict[str, Any] = {}
+
 
 # Global variables for graceful shutdown
 shutdown_event = asyncio.Event()
 stats = {
-    'total_sent': 0,
-    'last_second_count': 0,
     'start_time': None,
     'last_stats_time': None
 }
 
+# One send counter per worker; each worker only ever writes its own slot and
+# the reporter sums them once per second, keeping shared writes off the hot path
+worker_counts: List[int] = []
+
+
+def _attach_derived_defaults(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Precompute values derived from the config so main() just fetches them."""
+    config['_default_stocks_csv'] = ','.join(
+        config.get('stock_symbols', _EMPTY).get('default_symbols', DEFAULT_SYMBOLS))
+    return config
+
 
 def load_config(config_path: str = 'config.json') -> Dict[str, Any]:
     """Load configuration from JSON file."""
     try:
-        with open(config_path, 'r') as f:
-            return json.load(f)
+        # One pre-sized read straight off the fd, bypassing the
+        # TextIOWrapper/BufferedReader stack; orjson parses the bytes directly
+        fd = os.open(config_path, os.O_RDONLY)
+        try:
+            data = os.read(fd, os.fstat(fd).st_size)
+        finally:
+            os.close(fd)
+        return _attach_derived_defaults(_json_loads(data))
     except FileNotFoundError:
         print(f"Warning: Config file '{config_path}' not found. Using defaults.")
-        return {}
-    except json.JSONDecodeError as e:
+        return _attach_derived_defaults({})
+    except _JSONDecodeError as e:
         print(f"Error parsing config file '{config_path}': {e}")
         sys.exit(1)
 
 
 def get_eventhub_connection_details(config: Dict[str, Any]) -> tuple[str, str]:
     """Get Event Hub connection details from environment variables, config, or Azure Key Vault."""
-    # Get values from config file first
-    eventhub_config = config.get('eventhub', {})
-    config_connection_string = eventhub_config.get('connection_string')
-    config_eventhub_name = eventhub_config.get('eventhub_name')
-    
+    eventhub_config = config.get('eventhub', _EMPTY)
+    keyvault_config = config.get('azure_keyvault', _EMPTY)
+    return _resolve_connection_details(
+        eventhub_config.get('connection_string'),
+        eventhub_config.get('eventhub_name'),
+        tuple(sorted(keyvault_config.items()))
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _resolve_connection_details(config_connection_string: Optional[str],
+                                config_eventhub_name: Optional[str],
+                                keyvault_items: tuple) -> tuple[str, str]:
+    """Resolve and validate connection details once per configuration.
+
+    Environment and config are fixed for the lifetime of a run, so repeated
+    callers get the cached result (including any Key Vault round-trip).
+    """
+    keyvault_config = dict(keyvault_items)
+
     # Environment variables override config values (PRIORITY 1)
-    connection_string = os.getenv('EVENT_HUB_CONNECTION_STRING') or config_connection_string
-    eventhub_name = os.getenv('EVENT_HUB_NAME') or config_eventhub_name
-    
+    connection_string = _ENV_CONNECTION_STRING or config_connection_string
+    eventhub_name = _ENV_EVENTHUB_NAME or config_eventhub_name
+
     # Try Azure Key Vault if neither env vars nor config have values
-    keyvault_config = config.get('azure_keyvault', {})
     if keyvault_config.get('enabled', False) and not connection_string:
         try:
             from azure.keyvault.secrets import SecretClient
@@ -128,13 +199,16 @@ def get_eventhub_connection_details(config: Dict[str, Any]) -> tuple[str, str]:
 class MessageGenerator:
     """Generates synthetic JSON messages with configurable size and content."""
     
-    def __init__(self, target_size: int = 500, stock_symbols: List[str] = None, config: Dict[str, Any] = None):
+    def __init__(self, target_size: int = 500, stock_symbols: List[str] = None,
+                 config: Dict[str, Any] = None, message_format: str = 'json'):
         self.target_size = target_size
         self.stock_symbols = stock_symbols or ['AAPL', 'GOOGL', 'MSFT', 'TSLA', 'AMZN']
         self.config = config or {}
+        self.message_format = message_format
+        self._packb = msgpack.packb if message_format == 'msgpack' else None
         
         # Get message generation settings from config
-        msg_config = self.config.get('message_generation', {})
+        msg_config = self.config.get('message_generation', _EMPTY)
         self.target_field_count = msg_config.get('target_field_count', 100)
         self.field_count_variance = msg_config.get('field_count_variance', 5)
         self.size_tolerance = msg_config.get('size_tolerance', 50)
@@ -143,7 +217,49 @@ class MessageGenerator:
         self.float_precision = msg_config.get('float_precision', 2)
         
         self.field_templates = self._create_field_templates()
-        
+
+        # Pre-encoded JSON fragments so the hot path only concatenates bytes
+        self._stock_prefixes = [b'","stockName":"' + s.encode() + b'"' for s in self.stock_symbols]
+        self._field_keys = [b',"field_%d":' % i
+                            for i in range(self.target_field_count + self.field_count_variance + 1)]
+
+        # Timestamp bytes cached per millisecond, with the second-resolution
+        # part cached separately (see _timestamp_bytes)
+        self._ts_ms = 0
+        self._ts_bytes = b''
+        self._ts_sec = 0
+        self._ts_sec_bytes = b''
+
+        # The compiled renderer writes into a fixed-size C buffer, so it only
+        # handles messages that fit; larger --msg-size runs stay on the
+        # pure-Python path, which honors any target size
+        self._use_compiled = (_message_gen is not None and
+                              target_size <= getattr(_message_gen, 'BUF_CAPACITY', 8192))
+
+        # Pool of pre-rendered JSON values for the compiled field renderer
+        if self._use_compiled:
+            self._value_pool = [_json_dumps(random.choice(self.field_templates)())
+                                for _ in range(4096)]
+
+        # Specialize generate_message for this exact configuration unless a
+        # faster path (compiled renderer, msgpack encoding) already covers it
+        if self._packb is None and not self._use_compiled:
+            self.generate_message = self._build_specialized_generator().__get__(self)
+
+        if np is not None:
+            min_str, max_str = self.string_length_range
+            self._rng = np.random.default_rng()
+            self._status_pool = [b'"active"', b'"inactive"', b'"pending"', b'"completed"', b'"failed"']
+            # Random strings are expensive to vectorize, so draw from a pre-encoded pool
+            self._string_pool = [
+                _json_dumps(''.join(random.choices(string.ascii_letters + string.digits,
+                                                   k=random.randint(min_str, max_str))))
+                for _ in range(256)
+            ]
+        else:
+            self._rng = None
+
+
     def _create_field_templates(self) -> List[callable]:
         """Create templates for generating different types of field values."""
         min_str, max_str = self.string_length_range
@@ -160,174 +276,499 @@ class MessageGenerator:
             lambda: random.randint(1000000000, 9999999999),  # large numbers (timestamps, IDs)
         ]
     
-    def generate_message(self) -> str:
-        """Generate a single JSON message close to the target size."""
+    def _build_specialized_generator(self) -> callable:
+        """Generate a message builder specialized for this configuration.
+
+        Target size, size tolerance and field count are fixed for the
+        lifetime of the generator, so the field loop is unrolled into
+        straight-line source with those limits inlined as constants and the
+        result compiled with exec(). This removes the per-field loop
+        bookkeeping of the generic implementation; the size-targeting rule
+        (stop before the message would exceed target_size) is unchanged.
+        """
+        max_fields = self.target_field_count + self.field_count_variance
+        limit = self.target_size - self.size_tolerance
+
+        lines = [
+            "def _gen(self, _choice=random.choice, _randint=random.randint, _dumps=_json_dumps):",
+            "    buf = bytearray(b'{\"timestamp\":\"')",
+            "    buf += self._timestamp_bytes()",
+            "    buf += _choice(self._stock_prefixes)",
+            "    t = self.field_templates",
+            "    k = self._field_keys",
+            f"    mf = {self.target_field_count} + _randint(-{self.field_count_variance}, "
+            f"{self.field_count_variance})",
+        ]
+        for i in range(max_fields):
+            lines += [
+                f"    if {i} >= mf or len(buf) >= {limit}:",
+                "        buf += b'}'",
+                "        return bytes(buf)",
+                f"    v = k[{i}] + _dumps(_choice(t)())",
+                f"    if len(buf) + len(v) + 1 > {self.target_size}:",
+                "        buf += b'}'",
+                "        return bytes(buf)",
+                "    buf += v",
+            ]
+        lines += [
+            "    buf += b'}'",
+            "    return bytes(buf)",
+        ]
+
+        namespace = {'random': random, '_json_dumps': _json_dumps}
+        exec('\n'.join(lines), namespace)
+        return namespace['_gen']
+
+    def _timestamp_bytes(self) -> bytes:
+        """Return the current ISO timestamp as bytes, cached per millisecond.
+
+        Messages generated within the same millisecond reuse the formatted
+        bytes. On a millisecond rollover only the '.mmm' suffix is rebuilt;
+        the date/time part goes through C-level time.strftime and is itself
+        cached per second, so no datetime object is ever constructed.
+        """
+        ms = time.time_ns() // 1_000_000
+        if ms != self._ts_ms:
+            self._ts_ms = ms
+            sec, msec = divmod(ms, 1000)
+            if sec != self._ts_sec:
+                self._ts_sec = sec
+                self._ts_sec_bytes = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(sec)).encode()
+            self._ts_bytes = self._ts_sec_bytes + b'.%03d+00:00' % msec
+        return self._ts_bytes
+
+    def _generate_msgpack(self) -> bytes:
+        """Generate a single MessagePack-encoded message close to the target size.
+
+        Field sizes are estimated from their text rendering, so binary
+        payloads come out somewhat under target (MessagePack is denser than
+        JSON); consumers must decode with msgpack rather than json.
+        """
         message = {
-            'timestamp': datetime.now(timezone.utc).isoformat(),
-            'stockName': random.choice(self.stock_symbols)
+            'timestamp': self._timestamp_bytes().decode(),
+            'stockName': random.choice(self.stock_symbols),
         }
-        
-        # Start with base message and calculate remaining space
-        base_json = json.dumps(message, separators=(',', ':'))
-        remaining_size = self.target_size - len(base_json) - 2  # Account for outer braces
-        
+        current_size = 30 + len(message['timestamp']) + len(message['stockName'])
+
         field_count = 0
-        current_size = len(base_json)
-        
-        # Add fields until we reach target size or target field count
         max_fields = self.target_field_count + random.randint(-self.field_count_variance, self.field_count_variance)
         while current_size < self.target_size - self.size_tolerance and field_count < max_fields:
-            field_name = f"field_{field_count}"
             field_value = random.choice(self.field_templates)()
-            
-            # Calculate the size this field would add
-            field_json = f'"{field_name}":{json.dumps(field_value, separators=(",", ":"))}'
-            field_size = len(field_json) + 1  # +1 for comma
-            
-            # If adding this field would exceed target, try a smaller value
+            field_size = len(f"field_{field_count}") + len(str(field_value)) + 2
             if current_size + field_size > self.target_size:
+                break
+            message[f"field_{field_count}"] = field_value
+            current_size += field_size
+            field_count += 1
+
+        return self._packb(message)
+
+    def generate_message(self) -> bytes:
+        """Generate a single JSON message close to the target size as UTF-8 bytes.
+
+        The message is assembled directly into a bytearray from pre-encoded
+        fragments, so no intermediate dict or str is allocated and the result
+        can be handed straight to EventData.
+        """
+        if self._packb is not None:
+            return self._generate_msgpack()
+
+        if self._use_compiled:
+            # Compiled fast path: the per-field loop runs in C over the
+            # pre-rendered value pool
+            prefix = b'{"timestamp":"' + self._timestamp_bytes() + random.choice(self._stock_prefixes)
+            max_fields = self.target_field_count + random.randint(-self.field_count_variance,
+                                                                  self.field_count_variance)
+            fields = _message_gen.render_fields(
+                self._field_keys, self._value_pool, len(prefix),
+                self.target_size, self.size_tolerance, max_fields,
+                random.getrandbits(32))
+            return prefix + fields + b'}'
+
+        buf = bytearray(b'{"timestamp":"')
+        buf += self._timestamp_bytes()
+        buf += random.choice(self._stock_prefixes)
+
+        field_count = 0
+        # Add fields until we reach target size or target field count
+        max_fields = self.target_field_count + random.randint(-self.field_count_variance, self.field_count_variance)
+        while len(buf) < self.target_size - self.size_tolerance and field_count < max_fields:
+            field_key = self._field_keys[field_count]
+            field_value = random.choice(self.field_templates)()
+            field_json = field_key + _json_dumps(field_value)
+
+            # If adding this field would exceed target, try a smaller value
+            if len(buf) + len(field_json) + 1 > self.target_size:
                 if isinstance(field_value, str) and len(field_value) > 5:
                     # Truncate string to fit
-                    max_str_len = self.target_size - current_size - len(field_name) - 10
+                    max_str_len = self.target_size - len(buf) - len(field_key) - 10
                     if max_str_len > 0:
-                        field_value = field_value[:max_str_len]
+                        field_json = field_key + _json_dumps(field_value[:max_str_len])
                     else:
                         break
                 elif isinstance(field_value, (int, float)) and field_count > 10:
                     # Use smaller number
-                    field_value = random.randint(1, 99)
+                    field_json = field_key + _json_dumps(random.randint(1, 99))
                 else:
                     break
-            
-            message[field_name] = field_value
-            current_size += field_size
+
+            buf += field_json
             field_count += 1
-        
-        return json.dumps(message, separators=(',', ':'))
+
+        buf += b'}'
+        return bytes(buf)
+
+    def generate_batch(self, n: int) -> List[bytes]:
+        """Generate a batch of n messages using vectorized NumPy RNG.
+
+        All random draws for the batch happen in a handful of array calls
+        instead of ~100 Python-level random.* calls per message, which
+        amortizes interpreter overhead across the whole batch. Values are
+        rendered with plain bytes %-formatting as they are consumed;
+        np.char.mod/np.char.encode look vectorized but iterate per element
+        at Python level and benchmark far slower. Falls back to per-message
+        generation when NumPy is not installed.
+
+        The vectorized path renders JSON only; MessagePack batches go
+        through the per-message encoder.
+        """
+        if self._rng is None or self._packb is not None:
+            return [self.generate_message() for _ in range(n)]
+
+        rng = self._rng
+        min_num, max_num = self.number_range
+        max_fields_per_msg = self.target_field_count + self.field_count_variance
+        total = n * max_fields_per_msg
+
+        template_idx = rng.integers(0, 8, size=total).tolist()
+        ints = rng.integers(min_num, max_num + 1, size=total).tolist()
+        floats = (rng.random(size=total) * (max_num / 100) + 0.01).tolist()
+        stock_idx = rng.integers(0, len(self._stock_prefixes), size=n).tolist()
+        max_fields = rng.integers(self.target_field_count - self.field_count_variance,
+                                  max_fields_per_msg + 1, size=n).tolist()
+
+        statuses = self._status_pool
+        strings = self._string_pool
+        n_strings = len(strings)
+        float_fmt = b'%%.%df' % self.float_precision
+        field_keys = self._field_keys
+        prefix = b'{"timestamp":"' + self._timestamp_bytes()
+        limit = self.target_size - self.size_tolerance
+        target_size = self.target_size
+
+        messages = []
+        cursor = 0
+        for i in range(n):
+            buf = bytearray(prefix)
+            buf += self._stock_prefixes[stock_idx[i]]
+            field_count = 0
+            msg_fields = max_fields[i]
+            while len(buf) < limit and field_count < msg_fields:
+                template = template_idx[cursor]
+                x = ints[cursor]
+                if template == 0:
+                    value = b'%d' % x  # integers
+                elif template == 1:
+                    value = float_fmt % floats[cursor]  # floats
+                elif template == 2:
+                    value = b'true' if x & 1 else b'false'  # booleans
+                elif template == 3:
+                    value = strings[x % n_strings]  # pooled random strings
+                elif template == 4:
+                    value = statuses[x % 5]  # status strings
+                elif template == 5:
+                    value = b'"user_%d"' % (1000 + x % 9000)  # user IDs
+                elif template == 6:
+                    value = b'"session_%d"' % (100000 + x % 900000)  # session IDs
+                else:
+                    value = b'%d' % (1000000000 + x)  # large numbers (timestamps, IDs)
+                cursor += 1
+
+                field_json = field_keys[field_count] + value
+                if len(buf) + len(field_json) + 1 > target_size:
+                    break
+                buf += field_json
+                field_count += 1
+            buf += b'}'
+            messages.append(bytes(buf))
+        return messages
+
+
+# One generator per worker process, built lazily on first use
+_process_generator: Optional[MessageGenerator] = None
+
+
+def _generate_batch_in_process(batch_size: int, target_size: int,
+                               stock_symbols: List[str], config: Dict[str, Any],
+                               message_format: str = 'json') -> List[bytes]:
+    """Generate a batch inside a generation worker process.
+
+    MessageGenerator holds lambdas and RNG state that don't pickle, so only
+    its constructor arguments cross the process boundary; each process builds
+    its own generator once and reuses it for all subsequent batches.
+    """
+    global _process_generator
+    if _process_generator is None:
+        _process_generator = MessageGenerator(target_size, stock_symbols, config, message_format)
+    return _process_generator.generate_batch(batch_size)
 
 
 class EventHubSender:
     """Handles high-throughput sending to Azure Event Hub."""
-    
-    def __init__(self, connection_string: str, eventhub_name: str):
+
+    # Approximate per-event AMQP framing overhead on top of the raw body
+    EVENT_OVERHEAD_BYTES = 32
+
+    # Request batches up to the Event Hub maximum (1 MB) instead of the default
+    MAX_BATCH_SIZE_BYTES = 1048576
+
+
+    def __init__(self, connection_string: str, eventhub_name: str, partition_id: Optional[str] = None,
+                 buffered: bool = False, worker_id: Optional[int] = None):
         self.connection_string = connection_string
         self.eventhub_name = eventhub_name
+        self.partition_id = partition_id
+        self.buffered = buffered
+        self.worker_id = worker_id
         self.producer = None
+
+    async def _on_send_success(self, events, partition_id):
+        """Buffered-mode delivery callback; counts sends as they complete."""
+        if self.worker_id is not None:
+            worker_counts[self.worker_id] += len(events)
+
+    async def _on_send_error(self, events, partition_id, error):
+        logging.error(f"Buffered send of {len(events)} events failed "
+                      f"(partition {partition_id}): {error}")
         
     async def __aenter__(self):
-        self.producer = EventHubProducerClient.from_connection_string(
+        # Raw AMQP (not websockets) with fast retries; batches are sized up
+        # to the 1 MB hub limit via MAX_BATCH_SIZE_BYTES in create_batch
+        client_kwargs = dict(
             conn_str=self.connection_string,
-            eventhub_name=self.eventhub_name
+            eventhub_name=self.eventhub_name,
+            transport_type=TransportType.Amqp,
+            retry_total=3,
+            retry_backoff_factor=0.2
         )
+        if self.buffered:
+            # SDK-managed queue that coalesces and flushes batches itself
+            client_kwargs.update(
+                buffered_mode=True,
+                max_wait_time=0.05,
+                max_buffer_length=50000,
+                on_success=self._on_send_success,
+                on_error=self._on_send_error
+            )
+        self.producer = EventHubProducerClient.from_connection_string(**client_kwargs)
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.producer:
             await self.producer.close()
     
-    async def send_batch(self, messages: List[str]) -> int:
-        """Send a batch of messages to Event Hub."""
+    async def send_events(self, events: List[tuple]) -> int:
+        """Send (EventData, body_size) pairs to Event Hub.
+
+        The producer connection is opened once in __aenter__ and reused for
+        every batch; re-entering the producer context here would tear down
+        and re-establish the AMQP link on each call.
+
+        Batch capacity is tracked with a running byte counter so a full
+        batch is normally flushed before add() would overflow. The counter
+        is an estimate (EVENT_OVERHEAD_BYTES can undershoot when the SDK
+        adds per-event framing such as tracing properties), so overflow on
+        add() is still caught: the batch is flushed and the add retried,
+        paying the exception cost only on the rare misestimate.
+
+        In buffered mode events are handed to the SDK's internal queue and
+        counted on delivery by the on_success callback, so this returns 0.
+        """
         try:
-            async with self.producer:
-                event_data_batch = await self.producer.create_batch()
-                
-                for message in messages:
-                    try:
-                        event_data_batch.add(EventData(message))
-                    except ValueError:
-                        # Batch is full, send it and create a new one
-                        await self.producer.send_batch(event_data_batch)
-                        event_data_batch = await self.producer.create_batch()
-                        event_data_batch.add(EventData(message))
-                
-                # Send the final batch
-                if len(event_data_batch) > 0:
+            if self.buffered:
+                for event, _ in events:
+                    await self.producer.send_event(event, partition_id=self.partition_id)
+                return 0
+
+            event_data_batch = await self.producer.create_batch(
+                partition_id=self.partition_id, max_size_in_bytes=self.MAX_BATCH_SIZE_BYTES)
+            max_bytes = event_data_batch.max_size_in_bytes
+            cur_bytes = 0
+
+            for event, body_size in events:
+                msg_bytes = body_size + self.EVENT_OVERHEAD_BYTES
+                if cur_bytes + msg_bytes > max_bytes and len(event_data_batch) > 0:
+                    # Batch is full, send it and create a new one
                     await self.producer.send_batch(event_data_batch)
-                
-                return len(messages)
+                    event_data_batch = await self.producer.create_batch(
+                        partition_id=self.partition_id, max_size_in_bytes=self.MAX_BATCH_SIZE_BYTES)
+                    cur_bytes = 0
+                try:
+                    event_data_batch.add(event)
+                except ValueError:
+                    # Preflight estimate undershot the real framing overhead:
+                    # flush and retry once in a fresh batch
+                    if len(event_data_batch) == 0:
+                        raise
+                    await self.producer.send_batch(event_data_batch)
+                    event_data_batch = await self.producer.create_batch(
+                        partition_id=self.partition_id, max_size_in_bytes=self.MAX_BATCH_SIZE_BYTES)
+                    cur_bytes = 0
+                    event_data_batch.add(event)
+                cur_bytes += msg_bytes
+
+            # Send the final batch
+            if len(event_data_batch) > 0:
+                await self.producer.send_batch(event_data_batch)
+
+            return len(events)
         except Exception as e:
             logging.error(f"Error sending batch: {e}")
             return 0
 
+    async def send_batch(self, messages: List[bytes]) -> int:
+        """Send a batch of pre-encoded messages to Event Hub."""
+        return await self.send_events([(EventData(body=m), len(m)) for m in messages])
+
 
 async def message_sender_worker(
-    sender: EventHubSender,
+    connection_string: str,
+    eventhub_name: str,
     message_generator: MessageGenerator,
     rate_per_worker: int,
     worker_id: int,
-    config: Dict[str, Any] = None
+    config: Dict[str, Any] = None,
+    partition_id: Optional[str] = None,
+    message_pool: Optional[List[tuple]] = None,
+    gen_executor: Optional[ProcessPoolExecutor] = None,
+    buffered: bool = False
 ):
-    """Worker coroutine that sends messages at specified rate."""
-    simulator_config = config.get('simulator', {}) if config else {}
+    """Worker coroutine that owns its own producer and sends at specified rate.
+
+    Each worker creates its own EventHubProducerClient so every worker gets
+    its own AMQP connection instead of all workers serializing onto a shared
+    one. When a partition id is given, the worker's batches are pinned to it.
+
+    When a message pool is provided the worker round-robins through it
+    instead of generating fresh messages, removing generation from the hot
+    path entirely.
+    """
+    simulator_config = config.get('simulator', _EMPTY) if config else _EMPTY
     min_batch = simulator_config.get('min_batch_size', 1)
     max_batch = simulator_config.get('max_batch_size', 1000)
     batch_size_per_1k = simulator_config.get('batch_size_per_1k_rate', 100)
-    
+
     # Calculate adaptive batch size
     target_batch = (rate_per_worker // 10) if rate_per_worker > 0 else batch_size_per_1k
     batch_size = max(min_batch, min(max_batch, target_batch))
-    
-    sleep_time = batch_size / rate_per_worker if rate_per_worker > 0 else 0.01
-    
-    logging.info(f"Worker {worker_id} starting: {rate_per_worker} msg/sec, batch size: {batch_size}")
-    
-    while not shutdown_event.is_set():
-        try:
-            # Generate batch of messages
-            messages = [message_generator.generate_message() for _ in range(batch_size)]
-            
-            # Send batch
-            sent_count = await sender.send_batch(messages)
-            
-            # Update statistics
-            stats['total_sent'] += sent_count
-            stats['last_second_count'] += sent_count
-            
-            # Rate limiting
-            if sleep_time > 0:
-                await asyncio.sleep(sleep_time)
-                
-        except asyncio.CancelledError:
-            break
-        except Exception as e:
-            logging.error(f"Worker {worker_id} error: {e}")
-            await asyncio.sleep(0.1)  # Brief pause on error
+
+    batch_interval = batch_size / rate_per_worker if rate_per_worker > 0 else 0.01
+
+    logging.info(f"Worker {worker_id} starting: {rate_per_worker} msg/sec, batch size: {batch_size}, "
+                 f"partition: {partition_id if partition_id is not None else 'round-robin'}")
+
+    pool_size = len(message_pool) if message_pool else 0
+    pool_idx = (worker_id * batch_size) % pool_size if pool_size else 0  # Decorrelate workers
+
+    async with EventHubSender(connection_string, eventhub_name, partition_id,
+                              buffered, worker_id) as sender:
+        loop = asyncio.get_running_loop()
+        next_deadline = loop.time()
+
+        while not shutdown_event.is_set():
+            try:
+                # Take the next slice of pre-wrapped events from the pool,
+                # or generate and wrap a fresh batch
+                if pool_size:
+                    events = [message_pool[(pool_idx + i) % pool_size] for i in range(batch_size)]
+                    pool_idx = (pool_idx + batch_size) % pool_size
+                    sent_count = await sender.send_events(events)
+                elif gen_executor is not None:
+                    # Generate on another core so the event loop only sends
+                    messages = await loop.run_in_executor(
+                        gen_executor, _generate_batch_in_process, batch_size,
+                        message_generator.target_size, message_generator.stock_symbols,
+                        message_generator.config, message_generator.message_format)
+                    sent_count = await sender.send_batch(messages)
+                else:
+                    sent_count = await sender.send_batch(message_generator.generate_batch(batch_size))
+
+                # Update this worker's own counter
+                worker_counts[worker_id] += sent_count
+
+                # Deadline-based pacing: advance a fixed schedule and only
+                # sleep off the time we are ahead of it, so send latency is
+                # absorbed instead of being added on top of a fixed sleep
+                next_deadline += batch_interval
+                delay = next_deadline - loop.time()
+                if delay > 0.001:
+                    await asyncio.sleep(delay)
+                else:
+                    await asyncio.sleep(0)  # Behind schedule: just yield
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logging.error(f"Worker {worker_id} error: {e}")
+                await asyncio.sleep(0.1)  # Brief pause on error
+
+
+def _write_stats_line(line: str):
+    """Write the progress line; runs on the reporter's thread, not the loop."""
+    sys.stdout.write(line)
+    sys.stdout.flush()
 
 
 async def stats_reporter():
-    """Reports statistics every second."""
+    """Reports statistics every second by aggregating the per-worker counters.
+
+    The actual TTY write happens on a single-thread executor so a slow or
+    remote terminal cannot block the event loop that the workers run on.
+    """
     stats['start_time'] = time.time()
     stats['last_stats_time'] = stats['start_time']
-    
-    while not shutdown_event.is_set():
-        try:
-            await asyncio.sleep(1.0)
-            
-            current_time = time.time()
-            elapsed = current_time - stats['start_time']
-            
-            # Calculate rates
-            current_rate = stats['last_second_count']
-            avg_rate = stats['total_sent'] / elapsed if elapsed > 0 else 0
-            
-            print(f"\r[{elapsed:.0f}s] Current: {current_rate:,} msg/sec | "
-                  f"Average: {avg_rate:,.0f} msg/sec | "
-                  f"Total: {stats['total_sent']:,} messages", end='', flush=True)
-            
-            # Reset counter for next second
-            stats['last_second_count'] = 0
-            stats['last_stats_time'] = current_time
-            
-        except asyncio.CancelledError:
-            break
+    prev_total = 0
+    loop = asyncio.get_running_loop()
+    log_pool = ThreadPoolExecutor(max_workers=1)
 
+    try:
+        while not shutdown_event.is_set():
+            try:
+                await asyncio.sleep(1.0)
 
-def signal_handler(signum, frame):
-    """Handle Ctrl+C gracefully."""
+                current_time = time.time()
+                elapsed = current_time - stats['start_time']
+
+                # Calculate rates from one snapshot of the worker counters
+                total = sum(worker_counts)
+                current_rate = total - prev_total
+                avg_rate = total / elapsed if elapsed > 0 else 0
+
+                loop.run_in_executor(log_pool, _write_stats_line,
+                                     f"\r[{elapsed:.0f}s] Current: {current_rate:,} msg/sec | "
+                                     f"Average: {avg_rate:,.0f} msg/sec | "
+                                     f"Total: {total:,} messages")
+
+                prev_total = total
+                stats['last_stats_time'] = current_time
+
+            except asyncio.CancelledError:
+                break
+    finally:
+        log_pool.shutdown(wait=False)
+
+
+def _request_shutdown():
+    """Signal callback registered on the event loop."""
     print("\n\nShutdown signal received. Stopping gracefully...")
     shutdown_event.set()
 
 
+def signal_handler(signum, frame):
+    """Handle Ctrl+C gracefully (fallback where loop signal handlers are unsupported)."""
+    _request_shutdown()
+
+
 def load_stock_symbols(stocks_input: str) -> List[str]:
     """Load stock symbols from string or file."""
     if ',' in stocks_input:
@@ -350,11 +791,19 @@ async def main():
     # Load configuration first
     config = load_config()
     
-    # Get default values from config
-    default_rate = config.get('simulator', {}).get('default_rate', 10000)
-    default_msg_size = config.get('simulator', {}).get('default_message_size', 500)
-    default_stocks = ','.join(config.get('stock_symbols', {}).get('default_symbols', ['AAPL', 'GOOGL', 'MSFT', 'TSLA', 'AMZN']))
-    
+    # Get default values from config, fetching each subsection once
+    sim_config = config.get('simulator', _EMPTY)
+    default_rate = sim_config.get('default_rate', 10000)
+    default_msg_size = sim_config.get('default_message_size', 500)
+    default_unique = sim_config.get('unique_messages', 10000)
+    default_format = sim_config.get('message_format', 'json')
+    default_buffered = sim_config.get('buffered_mode', False)
+    default_stocks = config['_default_stocks_csv']
+    
+    # Imported lazily: argparse (and its transitive gettext/textwrap imports)
+    # is only needed when actually running the CLI, not when importing the module
+    import argparse
+
     parser = argparse.ArgumentParser(
         description='Azure Event Hub High-Throughput Message Simulator',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -375,9 +824,22 @@ Examples:
                        help='Duration to run in seconds (optional)')
     parser.add_argument('--msg-size', type=int, default=default_msg_size,
                        help=f'Approximate message size in bytes (default: {default_msg_size})')
+    parser.add_argument('--unique-messages', type=int, default=default_unique,
+                       help=f'Pre-generate this many messages and cycle through them; '
+                            f'0 generates every message fresh (default: {default_unique})')
+    parser.add_argument('--format', choices=['json', 'msgpack'], default=default_format,
+                       help=f'Payload encoding; msgpack is smaller and cheaper to encode, '
+                            f'but consumers must decode it accordingly (default: {default_format})')
+    parser.add_argument('--buffered', action='store_true', default=default_buffered,
+                       help='Use the SDK buffered producer, which queues events and '
+                            'flushes batches in the background')
     
     args = parser.parse_args()
-    
+
+    if args.format == 'msgpack' and msgpack is None:
+        print("Error: MessagePack support not found. Install with: pip install msgpack")
+        sys.exit(1)
+
     # Get Event Hub connection details
     connection_string, eventhub_name = get_eventhub_connection_details(config)
     
@@ -387,79 +849,123 @@ Examples:
     
     # Set up logging
     logging.basicConfig(level=logging.WARNING, format='%(levelname)s: %(message)s')
-    
-    # Set up graceful shutdown
-    signal.signal(signal.SIGINT, signal_handler)
-    
+
+    # Graceful shutdown: SIGINT handled on the loop itself, so we can block
+    # on the event instead of waking up to poll it. Registered before the
+    # message pool is pre-generated so Ctrl+C during startup still shuts
+    # down cleanly instead of escaping as a raw KeyboardInterrupt.
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGINT, _request_shutdown)
+    except NotImplementedError:
+        # Windows event loops don't support loop signal handlers
+        signal.signal(signal.SIGINT, signal_handler)
+
+
     # Initialize components
-    message_generator = MessageGenerator(args.msg_size, stock_symbols, config)
-    
-    print(f"Starting Azure Event Hub Simulator...")
-    print(f"Target rate: {args.rate:,} messages/second")
-    print(f"Message size: ~{args.msg_size} bytes")
-    print(f"Duration: {'Unlimited' if not args.duration else f'{args.duration} seconds'}")
-    print(f"Event Hub: {eventhub_name}")
-    print("Press Ctrl+C to stop gracefully\n")
+    message_generator = MessageGenerator(args.msg_size, stock_symbols, config, args.format)
+    
+    # Display configuration with one buffered write instead of a print per line
+    sys.stdout.write('\n'.join([
+        "Starting Azure Event Hub Simulator...",
+        f"Target rate: {args.rate:,} messages/second",
+        f"Message size: ~{args.msg_size} bytes",
+        f"Payload format: {args.format}",
+        f"Duration: {'Unlimited' if not args.duration else f'{args.duration} seconds'}",
+        f"Event Hub: {eventhub_name}",
+        "Press Ctrl+C to stop gracefully\n",
+    ]) + '\n')
     
     # Calculate optimal number of workers based on config
-    simulator_config = config.get('simulator', {})
-    max_workers = simulator_config.get('max_workers', 50)
-    batch_size_per_1k = simulator_config.get('batch_size_per_1k_rate', 100)
+    max_workers = sim_config.get('max_workers', 50)
+    batch_size_per_1k = sim_config.get('batch_size_per_1k_rate', 100)
     
     num_workers = min(max_workers, max(1, args.rate // 1000))  # 1 worker per 1000 msg/sec, with config max
     rate_per_worker = args.rate // num_workers
     
     print(f"Using {num_workers} workers, {rate_per_worker:,} msg/sec per worker\n")
+
+    worker_counts[:] = [0] * num_workers
+
+    # Pre-generate the shared message pool unless unique content was requested.
+    # Pool entries are wrapped in EventData once here, not per send
+    message_pool = None
+    gen_executor = None
+    if args.unique_messages > 0:
+        print(f"Pre-generating message pool ({args.unique_messages:,} messages)...")
+        message_pool = [(EventData(body=m), len(m))
+                        for m in message_generator.generate_batch(args.unique_messages)]
+    else:
+        # Fully unique content: generation would saturate a single core under
+        # the GIL, so spread it across a process pool instead
+        gen_executor = ProcessPoolExecutor(max_workers=os.cpu_count())
     
+    # Optional partition pinning: with a known partition count each worker is
+    # pinned to one partition so connections don't contend on a single link
+    partition_count = config.get('eventhub', _EMPTY).get('partition_count')
+
     try:
-        async with EventHubSender(connection_string, eventhub_name) as sender:
-            # Start all workers and stats reporter
-            tasks = []
-            
-            # Create sender workers
-            for i in range(num_workers):
-                task = asyncio.create_task(
-                    message_sender_worker(sender, message_generator, rate_per_worker, i, config)
-                )
-                tasks.append(task)
-            
-            # Add stats reporter
-            stats_task = asyncio.create_task(stats_reporter())
-            tasks.append(stats_task)
-            
-            # Run for specified duration or until interrupted
-            if args.duration:
-                await asyncio.sleep(args.duration)
-                shutdown_event.set()
-            else:
-                # Wait for shutdown signal
-                while not shutdown_event.is_set():
-                    await asyncio.sleep(0.1)
-            
-            # Cancel all tasks
-            for task in tasks:
-                task.cancel()
-            
-            # Wait for tasks to complete
-            await asyncio.gather(*tasks, return_exceptions=True)
+        # Start all workers and stats reporter
+        tasks = []
+
+        # Create sender workers, each with its own producer client
+        for i in range(num_workers):
+            partition_id = str(i % partition_count) if partition_count else None
+            task = asyncio.create_task(
+                message_sender_worker(connection_string, eventhub_name, message_generator,
+                                      rate_per_worker, i, config, partition_id, message_pool,
+                                      gen_executor, args.buffered)
+            )
+            tasks.append(task)
+
+        # Add stats reporter
+        stats_task = asyncio.create_task(stats_reporter())
+        tasks.append(stats_task)
+
+        # Wait until the duration elapses or a shutdown signal arrives
+        try:
+            await asyncio.wait_for(shutdown_event.wait(), timeout=args.duration)
+        except asyncio.TimeoutError:
+            pass
+        shutdown_event.set()
+
+        # Cancel all tasks
+        for task in tasks:
+            task.cancel()
+
+        # Wait for tasks to complete
+        await asyncio.gather(*tasks, return_exceptions=True)
     
     except Exception as e:
         logging.error(f"Fatal error: {e}")
         sys.exit(1)
     
     finally:
+        if gen_executor is not None:
+            # All worker tasks are already gathered, so waiting is bounded by
+            # one in-flight batch; wait=False races the pool's management
+            # thread against fd teardown and intermittently dumps an OSError
+            gen_executor.shutdown(wait=True, cancel_futures=True)
+
         # Final statistics
+        total_sent = sum(worker_counts)
         elapsed = time.time() - stats['start_time'] if stats['start_time'] else 0
-        avg_rate = stats['total_sent'] / elapsed if elapsed > 0 else 0
-        
+        avg_rate = total_sent / elapsed if elapsed > 0 else 0
+
         print(f"\n\nFinal Statistics:")
         print(f"Total runtime: {elapsed:.1f} seconds")
-        print(f"Total messages sent: {stats['total_sent']:,}")
+        print(f"Total messages sent: {total_sent:,}")
         print(f"Average rate: {avg_rate:,.0f} messages/second")
         print("Simulation completed.")
 
 
 if __name__ == '__main__':
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass  # uvloop is optional (and unavailable on Windows); stock asyncio still works
+
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
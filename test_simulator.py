@@ -5,46 +5,132 @@ This shows you how the script works and can be used to test the configuration lo
 """
 
 import json
-import argparse
+import marshal
+import struct
 import sys
 import os
+import functools
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _JSONDecodeError = orjson.JSONDecodeError
+except ImportError:
+    _json_loads = json.loads
+    _JSONDecodeError = json.JSONDecodeError
+
+# Immutable so the shared default can never be mutated by a caller
+DEFAULT_SYMBOLS = ('AAPL', 'GOOGL', 'MSFT', 'TSLA', 'AMZN')
+
+# Shared sentinel for config lookups, instead of allocating a fresh {} per miss
+_EMPTY = {}
+
+# Sidecar cache header: (mtime_ns, size) of the JSON file it was built from
+_CACHE_HEADER = struct.Struct('<qq')
+
+def _attach_derived_defaults(config):
+    """Precompute values derived from the config so main() just fetches them."""
+    config['_default_stocks_csv'] = ','.join(
+        config.get('stock_symbols', _EMPTY).get('default_symbols', DEFAULT_SYMBOLS))
+    return config
+
+def _load_cache(config_path, stat_result):
+    """Return the cached parsed config if the sidecar matches the source file."""
+    try:
+        with open(config_path + '.cache', 'rb') as f:
+            header = f.read(_CACHE_HEADER.size)
+            if (len(header) == _CACHE_HEADER.size and
+                    _CACHE_HEADER.unpack(header) == (stat_result.st_mtime_ns, stat_result.st_size)):
+                return marshal.loads(f.read())
+    except (OSError, ValueError, EOFError):
+        pass
+    return None
+
+def _write_cache(config_path, stat_result, config):
+    """Best-effort atomic write of the sidecar cache; failures are ignored."""
+    tmp_path = config_path + '.cache.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(_CACHE_HEADER.pack(stat_result.st_mtime_ns, stat_result.st_size))
+            f.write(marshal.dumps(config))
+        os.replace(tmp_path, config_path + '.cache')
+    except (OSError, ValueError):
+        pass
 
 def load_config(config_path: str = 'config.json'):
-    """Load configuration from JSON file."""
+    """Load configuration from JSON file.
+
+    The parsed dict is cached in a marshal sidecar ('config.json.cache')
+    keyed on the source file's mtime and size, so repeated invocations skip
+    the JSON parser entirely until the config changes.
+    """
+    try:
+        stat_result = os.stat(config_path)
+    except FileNotFoundError:
+        print(f"Warning: Config file '{config_path}' not found. Using defaults.")
+        return _attach_derived_defaults({})
+
+    config = _load_cache(config_path, stat_result)
+    if config is not None:
+        return config
+
     try:
-        with open(config_path, 'r') as f:
-            return json.load(f)
+        # One pre-sized read straight off the fd, bypassing the
+        # TextIOWrapper/BufferedReader stack; orjson parses the bytes directly
+        fd = os.open(config_path, os.O_RDONLY)
+        try:
+            data = os.read(fd, stat_result.st_size)
+        finally:
+            os.close(fd)
+        config = _json_loads(data)
     except FileNotFoundError:
         print(f"Warning: Config file '{config_path}' not found. Using defaults.")
-        return {}
-    except json.JSONDecodeError as e:
+        return _attach_derived_defaults({})
+    except _JSONDecodeError as e:
         print(f"Error parsing config file '{config_path}': {e}")
         sys.exit(1)
 
+    # Attach before writing so the sidecar persists the precomputed values too
+    config = _attach_derived_defaults(config)
+    _write_cache(config_path, stat_result, config)
+    return config
+
+# Environment overrides resolved once at import; they cannot change mid-run
+_ENV_CONNECTION_STRING = os.getenv('EVENT_HUB_CONNECTION_STRING')
+_ENV_EVENTHUB_NAME = os.getenv('EVENT_HUB_NAME')
+
 def get_eventhub_connection_details(config):
     """Get Event Hub connection details from config or environment variables."""
     # Try config file first
-    eventhub_config = config.get('eventhub', {})
-    connection_string = eventhub_config.get('connection_string')
-    eventhub_name = eventhub_config.get('eventhub_name')
-    
+    eventhub_config = config.get('eventhub', _EMPTY)
+    return _resolve_connection_details(eventhub_config.get('connection_string'),
+                                       eventhub_config.get('eventhub_name'))
+
+@functools.lru_cache(maxsize=1)
+def _resolve_connection_details(connection_string, eventhub_name):
+    """Resolve connection details once; config and env are fixed for a run."""
     # Fall back to environment variables if not in config
     if not connection_string:
-        connection_string = os.getenv('EVENT_HUB_CONNECTION_STRING')
+        connection_string = _ENV_CONNECTION_STRING
     if not eventhub_name:
-        eventhub_name = os.getenv('EVENT_HUB_NAME')
-    
+        eventhub_name = _ENV_EVENTHUB_NAME
+
     return connection_string, eventhub_name
 
 def main():
     # Load configuration first
     config = load_config()
     
-    # Get default values from config
-    default_rate = config.get('simulator', {}).get('default_rate', 10000)
-    default_msg_size = config.get('simulator', {}).get('default_message_size', 500)
-    default_stocks = ','.join(config.get('stock_symbols', {}).get('default_symbols', ['AAPL', 'GOOGL', 'MSFT', 'TSLA', 'AMZN']))
+    # Get default values from config, fetching the subsection once
+    sim_config = config.get('simulator', _EMPTY)
+    default_rate = sim_config.get('default_rate', 10000)
+    default_msg_size = sim_config.get('default_message_size', 500)
+    default_stocks = config['_default_stocks_csv']
     
+    # Imported lazily: argparse (and its transitive gettext/textwrap imports)
+    # is only needed when actually running the CLI, not when importing the module
+    import argparse
+
     parser = argparse.ArgumentParser(
         description='Azure Event Hub High-Throughput Message Simulator (Test Version)',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -71,14 +157,16 @@ Examples:
     # Get Event Hub connection details
     connection_string, eventhub_name = get_eventhub_connection_details(config)
     
-    # Display configuration
-    print("Configuration loaded successfully!")
-    print(f"Rate: {args.rate:,} messages/second")
-    print(f"Message size: {args.msg_size} bytes")
-    print(f"Stocks: {args.stocks}")
-    print(f"Duration: {'Unlimited' if not args.duration else f'{args.duration} seconds'}")
-    print(f"Event Hub Name: {eventhub_name}")
-    print(f"Connection String: {connection_string[:50]}..." if connection_string else "Connection String: Not found")
+    # Display configuration with one buffered write instead of a print per line
+    sys.stdout.write('\n'.join([
+        "Configuration loaded successfully!",
+        f"Rate: {args.rate:,} messages/second",
+        f"Message size: {args.msg_size} bytes",
+        f"Stocks: {args.stocks}",
+        f"Duration: {'Unlimited' if not args.duration else f'{args.duration} seconds'}",
+        f"Event Hub Name: {eventhub_name}",
+        f"Connection String: {connection_string[:50]}..." if connection_string else "Connection String: Not found",
+    ]) + '\n')
     
     if connection_string and eventhub_name:
         print("\n✅ Configuration is valid! Ready to run with Azure Event Hub.")